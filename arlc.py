@@ -1,8 +1,29 @@
 import numpy as np
-from typing import Tuple, Optional, List
+import functools
+import re
+from typing import Tuple, Optional
 from dataclasses import dataclass
 import time
-import random
+
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:  # numba is optional; encrypt falls back to plain NumPy
+    _HAVE_NUMBA = False
+
+try:
+    import cupy as cp
+    _HAVE_CUPY = True
+except ImportError:  # cupy is optional; only needed for backend='gpu'
+    _HAVE_CUPY = False
+
+# Upper bound on the gathered rows of A the NumPy encrypt path materializes at
+# once, so the (symbols, r_weight, n) temporary stays cache-resident
+_GATHER_TILE_BYTES = 1 << 19
+
+# Decrypted Latin-1 characters that are not printable (control characters, DEL,
+# C1, NBSP and soft hyphen; newline and tab are kept) are shown as '?'
+_NONPRINT_RE = re.compile(r'[\x00-\x08\x0b-\x1f\x7f-\xa0\xad]')
 
 @dataclass
 class ARLCParams:
@@ -15,22 +36,145 @@ class ARLCParams:
     delta: int = 32768 // 256  # Scaling factor (delta = 128) - increased for better error tolerance
     r_weight: int = 64  # Number of ones in the sparse binary vector r for encryption - increased for better error distribution
 
+@dataclass
+class Ciphertext:
+    """ARLC ciphertext for a whole message, one row/entry per message symbol"""
+    U: np.ndarray  # (L, n) int16, rows in Z_q^n
+    V: np.ndarray  # (L,) int32, entries in Z_q
+    
+    def __len__(self) -> int:
+        return len(self.V)
+
+if _HAVE_NUMBA:
+    @functools.lru_cache(maxsize=None)
+    def specialize_encrypt_kernel(n: int, r_weight: int):
+        """
+        Build encrypt_kernel for a fixed n and r_weight.
+        numba freezes the closure variables as compile-time constants, so
+        LLVM sees constant trip counts for the row and index loops and can
+        fully unroll and vectorize them. One kernel per (n, r_weight) is
+        built and cached (in memory and on disk).
+        """
+        w = r_weight
+        
+        @njit(parallel=True, fastmath=True, cache=True)
+        def encrypt_kernel(A, b, m_scaled, R_idx, qmask):
+            """
+            Compiled encryption of a whole message.
+            For symbol s with sparse-r ones R_idx[s], accumulates U[s] = Σ A[i] and
+            V[s] = Σ b[i] + m_scaled[s], reducing mod q (a bitmask, q being a power
+            of two) once at the end.
+            Symbols are independent and are spread across cores with prange.
+            The inner loops run over contiguous 1-D rows (acc, row) so LLVM emits
+            packed add / and instructions (AVX2/AVX-512) for them.
+            U[s] and V[s] are accumulated in local int32 buffers with no
+            intermediate reduction: r_weight · (q - 1) + (q - 1) ≈ 2^21 stays far
+            below 2^31. Only the masked results, which are < q ≤ 2^15, are
+            stored into the int16 U.
+            """
+            L = R_idx.shape[0]
+            U = np.empty((L, n), np.int16)
+            V = np.empty(L, np.int32)
+            for s in prange(L):
+                acc = np.zeros(n, np.int32)
+                v = np.int32(0)
+                for k in range(w):
+                    i = R_idx[s, k]
+                    row = A[i]
+                    for j in range(n):
+                        acc[j] += row[j]
+                    v += b[i]
+                for j in range(n):
+                    U[s, j] = acc[j] & qmask
+                V[s] = (v + m_scaled[s]) & qmask
+            return U, V
+        
+        return encrypt_kernel
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def decrypt_kernel(U, s):
+        """
+        Compiled U · s for every symbol of a message.
+        U (int16) and s (int8) are widened to int32 per term; with |s| ≤ eta
+        and U < q the n-term sums fit int32, and LLVM lowers the loop to packed
+        16-bit multiply-adds (pmaddwd). Symbols are spread across cores with prange.
+        """
+        L, n = U.shape
+        prods = np.empty(L, np.int32)
+        for i in prange(L):
+            row = U[i]
+            acc = np.int32(0)
+            for j in range(n):
+                acc += np.int32(row[j]) * np.int32(s[j])
+            prods[i] = acc
+        return prods
+    
+    @njit(cache=True)
+    def sparse_indices_kernel(draws, m):
+        """
+        Floyd's sampling of an r_weight-subset of range(m) for every symbol.
+        draws[s, k] must be uniform in [0, m - r_weight + k]. While a row is
+        sampled, its r is kept bit-packed in m/64 uint64 words, so the
+        "already chosen?" test is a single AND instead of a scan.
+        """
+        L, w = draws.shape
+        idx = np.empty((L, w), np.int64)
+        bits = np.zeros((m + 63) // 64, np.uint64)
+        for s in range(L):
+            bits[:] = 0
+            for k in range(w):
+                t = draws[s, k]
+                if (bits[t >> 6] >> np.uint64(t & 63)) & np.uint64(1):
+                    t = m - w + k
+                bits[t >> 6] |= np.uint64(1) << np.uint64(t & 63)
+                idx[s, k] = t
+        return idx
+
 class ARLC:
     """Avionics-Resilient Lattice Cryptography implementation using LWE-based encryption"""
     
-    def __init__(self, params: Optional[ARLCParams] = None):
+    def __init__(self, params: Optional[ARLCParams] = None, backend: str = 'cpu'):
         self.params = params or ARLCParams()
+        if backend not in ('cpu', 'gpu'):
+            raise ValueError(f"Unknown backend {backend!r}, expected 'cpu' or 'gpu'")
+        if backend == 'gpu' and not _HAVE_CUPY:
+            raise ImportError("backend='gpu' requires CuPy to be installed")
+        self.backend = backend
+        if self.params.q & (self.params.q - 1):
+            raise ValueError(f"Modulus q={self.params.q} must be a power of two")
+        if self.params.q > 1 << 15:
+            raise ValueError(f"Modulus q={self.params.q} must be at most 2^15 (U is stored as int16)")
+        if self.params.p > 256:
+            raise ValueError(f"Message space p={self.params.p} must be at most 256 (symbols are Latin-1 bytes)")
+        # x mod q == x & (q - 1) for a power-of-two q, also for negative x
+        self._qmask = self.params.q - 1
+        # Scaled value of every possible message symbol, so encoding is one gather
+        self._encode_lut = (((np.arange(self.params.p, dtype=np.int64) + self.params.p // 2)
+                             * self.params.delta) & self._qmask).astype(np.int32)
         # Set a fixed seed for reproducibility
         np.random.seed(42)
-        random.seed(42)
-        # Generate public matrix A of shape (m, n)
-        self.A = np.random.randint(0, self.params.q, (self.params.m, self.params.n))
+        # Generate public matrix A of shape (m, n). Entries are < q = 2^15, so they
+        # are drawn directly as uint16 from a PCG64 generator.
+        rng = np.random.default_rng(42)
+        self.A = rng.integers(0, self.params.q, (self.params.m, self.params.n), dtype=np.uint16)
+        # Reused output buffer for A · s + e in generate_keypair (uint16 · int8 -> int32)
+        self._b_scratch = np.empty(self.params.m, dtype=np.int32)
+        if self.backend == 'gpu':
+            # A is fixed for the lifetime of the instance, so upload it only once
+            self._A_d = cp.asarray(self.A)
+        if _HAVE_NUMBA:
+            self._encrypt_kernel = specialize_encrypt_kernel(self.params.n, self.params.r_weight)
+            # Warm up the JIT so the first encrypt/decrypt is not charged for compilation
+            self._encrypt_kernel(self.A, np.zeros(self.params.m, dtype=np.int32), self._encode_message(""),
+                                 self._generate_sparse_indices(0), self._qmask)
+            decrypt_kernel(np.zeros((0, self.params.n), dtype=np.int16), np.zeros(self.params.n, dtype=np.int8))
         
     def _generate_error(self, size: Tuple[int, ...]) -> np.ndarray:
         """
         Generate an error term sampled uniformly from [-eta, eta].
+        eta is small, so the terms are stored as int8.
         """
-        return np.random.randint(-self.params.eta, self.params.eta + 1, size)
+        return np.random.randint(-self.params.eta, self.params.eta + 1, size, dtype=np.int8)
     
     def generate_keypair(self) -> Tuple[Tuple[np.ndarray, np.ndarray], np.ndarray]:
         """
@@ -41,53 +185,100 @@ class ARLC:
         """
         s = self._generate_error((self.params.n,))      # Secret key (n,)
         e = self._generate_error((self.params.m,))      # Error vector (m,)
-        b = (np.dot(self.A, s) + e) % self.params.q     # Public vector b (m,)
+        np.dot(self.A, s, out=self._b_scratch)
+        np.add(self._b_scratch, e, out=self._b_scratch)
+        self._b_scratch &= self._qmask
+        b = self._b_scratch.copy()                      # Public vector b (m,)
         public_key = (self.A, b)
         return public_key, s
     
-    def _encode_message_symbol(self, m: int) -> int:
+    def _encode_message(self, message: str) -> np.ndarray:
         """
-        Scale a message symbol m (0 ≤ m < p) into lattice space.
-        We center the message by adding p//2 and then multiply by delta.
+        Scale every message symbol m (0 ≤ m < p) into lattice space.
+        We center the message by adding p//2 and then multiply by delta,
+        read from the precomputed _encode_lut.
         """
-        if not 0 <= m < self.params.p:
-            raise ValueError(f"Message symbol {m} is not in valid range [0, {self.params.p})")
-        return ((m + self.params.p // 2) * self.params.delta) % self.params.q
+        try:
+            ords = np.frombuffer(message.encode('latin1'), dtype=np.uint8)
+        except UnicodeEncodeError as exc:
+            bad = ord(message[exc.start])
+            raise ValueError(f"Message symbol {bad} is not in valid range [0, {self.params.p})") from None
+        # Latin-1 already bounds symbols to [0, 256), so only a smaller p needs a scan
+        if self.params.p < 256 and np.any(ords >= self.params.p):
+            bad = int(ords[np.argmax(ords >= self.params.p)])
+            raise ValueError(f"Message symbol {bad} is not in valid range [0, {self.params.p})")
+        return self._encode_lut[ords]
     
-    def _decode_message_symbol(self, m_scaled: int) -> int:
+    def _decode_message(self, m_scaled: np.ndarray) -> np.ndarray:
         """
-        Inverse of _encode_message_symbol.
-        Given m_scaled, recover m by dividing by delta and subtracting p//2.
+        Inverse of _encode_message.
+        Given m_scaled for every symbol, recover m by dividing by delta and
+        subtracting p//2.
         """
         # Ensure m_scaled is in the correct range
-        m_scaled = m_scaled % self.params.q
-        
-        # Compute the approximate message value
-        m_approx = int(round(m_scaled / self.params.delta)) - (self.params.p // 2)
+        m_scaled = m_scaled & self._qmask
         
-        # Ensure the result is in the valid range
-        m_rec = m_approx % self.params.p
+        # Compute the approximate message values (round half to even, like round())
+        m_approx = np.rint(m_scaled / self.params.delta).astype(np.int64) - (self.params.p // 2)
         
-        # Additional validation to ensure the recovered value is reasonable
-        if abs(m_approx - m_rec) > self.params.delta // 4:
-            # If the error is too large, we might have wrapped around
-            # Try the other possible value
-            alt_m = (m_rec + self.params.p) % self.params.p
-            if abs(m_approx - alt_m) < abs(m_approx - m_rec):
-                m_rec = alt_m
-                
-        return m_rec
+        # Ensure the results are in the valid range
+        return m_approx % self.params.p
+    
+    def _generate_sparse_indices(self, L: int) -> np.ndarray:
+        """
+        Generate L sparse binary vectors r ∈ {0,1}^m with exactly r_weight ones.
+        Each r is returned as the positions of its ones, giving an (L, r_weight)
+        index matrix instead of materializing the 0/1 vectors.
+        All L draws are done at once: r_weight bounded integers per row feed
+        Floyd's algorithm, compiled in sparse_indices_kernel or run column by
+        column over all rows in NumPy. Both paths consume the same draws and
+        give the same indices, so a seeded run does not depend on numba.
+        """
+        m, w = self.params.m, self.params.r_weight
+        draws = np.random.randint(0, np.arange(m - w + 1, m + 1), size=(L, w))
+        if _HAVE_NUMBA:
+            return sparse_indices_kernel(draws, m)
+        rows = np.arange(L)
+        taken = np.zeros((L, m), dtype=bool)
+        idx = np.empty((L, w), dtype=np.int64)
+        for k in range(w):
+            t = draws[:, k].copy()
+            t[taken[rows, t]] = m - w + k
+            taken[rows, t] = True
+            idx[:, k] = t
+        return idx
     
-    def _generate_sparse_r(self) -> np.ndarray:
+    def _encrypt_numpy(self, A: np.ndarray, b: np.ndarray, m_scaled: np.ndarray,
+                       idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Generate a sparse binary vector r ∈ {0,1}^m with exactly r_weight ones.
+        NumPy fallback for encrypt_kernel.
+        Rows of A are gathered and summed for a tile of symbols at a time, sized
+        by _GATHER_TILE_BYTES, instead of materializing A[idx] for the whole
+        message, which for long messages would spill out of cache.
         """
-        r = np.zeros(self.params.m, dtype=np.int64)
-        ones_positions = random.sample(range(self.params.m), self.params.r_weight)
-        r[ones_positions] = 1
-        return r
+        L, w = idx.shape
+        tile = max(1, _GATHER_TILE_BYTES // (w * A.shape[1] * A.itemsize))
+        U = np.empty((L, A.shape[1]), dtype=np.int32)
+        for s0 in range(0, L, tile):
+            A[idx[s0:s0 + tile]].sum(axis=1, dtype=np.int32, out=U[s0:s0 + tile])
+        U = (U & self._qmask).astype(np.int16)            # (L, n), rows in Z_q^n
+        V = (b[idx].sum(axis=1, dtype=np.int32) + m_scaled) & self._qmask  # (L,)
+        return U, V
     
-    def encrypt(self, message: str, public_key: Tuple[np.ndarray, np.ndarray]) -> List[Tuple[np.ndarray, int]]:
+    def _encrypt_gpu(self, A: np.ndarray, b: np.ndarray, m_scaled: np.ndarray,
+                     idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        CuPy version of encrypt_kernel for backend='gpu'.
+        Only the index matrix, b and m_scaled are transferred per call; the
+        resident copy of A is reused unless a different A is passed in.
+        """
+        A_d = self._A_d if A is self.A else cp.asarray(A)
+        idx_d = cp.asarray(idx)
+        U = (A_d[idx_d].sum(axis=1, dtype=cp.int32) & self._qmask).astype(cp.int16)
+        V = (cp.asarray(b)[idx_d].sum(axis=1, dtype=cp.int32) + cp.asarray(m_scaled)) & self._qmask
+        return cp.asnumpy(U), cp.asnumpy(V)
+    
+    def encrypt(self, message: str, public_key: Tuple[np.ndarray, np.ndarray]) -> Ciphertext:
         """
         Encrypt a message using the receiver's public key.
         
@@ -96,67 +287,73 @@ class ARLC:
           - Generate a sparse binary vector r (of length m) with a fixed Hamming weight.
           - Compute U = Aᵀ · r ∈ ℤ₍q₎ⁿ.
           - Compute V = rᵀ · b + m_scaled ∈ ℤ₍q₎.
+        All symbols are processed at once. Since r is binary, Aᵀ · r and rᵀ · b
+        are just sums of the rows of A (entries of b) selected by r's ones, so
+        only r_weight of the m rows are ever read per symbol.
         
         Returns:
-            A list of ciphertext tuples, one per message symbol.
-            Each tuple is (U, V) with U ∈ ℤ₍q₎ⁿ and V ∈ ℤ₍q₎.
+            A Ciphertext holding the U vectors of all message symbols as the
+            rows of an (L, n) matrix and their V values as an (L,) vector.
         """
         A, b = public_key
-        ciphertext = []
+        # Rows of A are gathered, so keep them contiguous (row-major); this is a
+        # no-op for keys from generate_keypair and avoids strided reads otherwise
+        A = np.ascontiguousarray(A)
+        if A.shape != (self.params.m, self.params.n):
+            raise ValueError(f"Public matrix A has shape {A.shape}, expected {(self.params.m, self.params.n)}")
+        if np.shape(b) != (self.params.m,):
+            raise ValueError(f"Public vector b has shape {np.shape(b)}, expected {(self.params.m,)}")
+        m_scaled = self._encode_message(message)           # (L,)
+        idx = self._generate_sparse_indices(len(m_scaled))  # (L, r_weight), ones of each r
+        
+        # Compute U and V for all symbols
+        if self.backend == 'gpu':
+            U, V = self._encrypt_gpu(A, b, m_scaled, idx)
+        elif _HAVE_NUMBA:
+            U, V = self._encrypt_kernel(A, b, m_scaled, idx, self._qmask)
+        else:
+            U, V = self._encrypt_numpy(A, b, m_scaled, idx)
         
-        for ch in message:
-            m_val = ord(ch)
-            m_scaled = self._encode_message_symbol(m_val)
-            r = self._generate_sparse_r()  # vector in {0,1}^m with weight r_weight
-            
-            # Compute U and V with additional error checking
-            U = np.dot(A.T, r) % self.params.q  # U is in Z_q^n
-            V = (np.dot(r, b) + m_scaled) % self.params.q
-            
-            # Validate the ciphertext components
-            if np.any(U >= self.params.q) or V >= self.params.q:
-                raise ValueError("Ciphertext components exceed modulus q")
-                
-            ciphertext.append((U, int(V)))
-            
-        return ciphertext
+        return Ciphertext(U, V)
     
-    def decrypt(self, ciphertext: List[Tuple[np.ndarray, int]], secret_key: np.ndarray) -> str:
+    def decrypt(self, ciphertext: Ciphertext, secret_key: np.ndarray) -> str:
         """
         Decrypt the ciphertext.
         
-        For each ciphertext tuple (U, V):
+        For each message symbol's (U, V):
           - Compute prod = Uᵀ · s.
           - Subtract prod from V to recover m_scaled (plus a small error).
           - Apply inverse scaling to recover the original message symbol.
+        The U vectors are the rows of an (L, n) matrix, so all products are
+        computed by a single matrix-vector multiply.
         
         Returns:
             The decrypted message string.
         """
-        message_chars = []
+        U, V = ciphertext.U, ciphertext.V
+        
+        # Validate input; the compiled kernels do no bounds checking
+        if U.ndim != 2 or V.shape != (U.shape[0],):
+            raise ValueError(f"Invalid ciphertext: U has shape {U.shape} but V has shape {V.shape}")
+        if np.shape(secret_key) != (U.shape[1],):
+            raise ValueError(f"Secret key has shape {np.shape(secret_key)}, expected {(U.shape[1],)}")
+        if (np.any(U < 0) or np.any(U >= self.params.q)
+                or np.any(V < 0) or np.any(V >= self.params.q)):
+            raise ValueError("Invalid ciphertext: components outside [0, q)")
+        
+        # Compute the products and recover the scaled message symbols
+        if self.backend == 'gpu':
+            prods = cp.asarray(U).astype(cp.int32) @ cp.asarray(secret_key, dtype=cp.int32)
+            prods = cp.asnumpy(prods) & self._qmask
+        elif _HAVE_NUMBA:
+            prods = decrypt_kernel(U, secret_key) & self._qmask
+        else:
+            prods = (U @ secret_key.astype(np.int32)) & self._qmask
+        m_scaled = (V - prods) & self._qmask
+        
+        # Decode the message symbols
+        m_rec = self._decode_message(m_scaled)
         
-        for U, V in ciphertext:
-            # Validate input
-            if np.any(U >= self.params.q) or V >= self.params.q:
-                raise ValueError("Invalid ciphertext: components exceed modulus q")
-            
-            # Compute the product and ensure it's in the correct range
-            prod = int(np.dot(U, secret_key) % self.params.q)
-            
-            # Recover the scaled message
-            m_scaled = (V - prod) % self.params.q
-            
-            # Decode the message symbol
-            m_rec = self._decode_message_symbol(m_scaled)
-            
-            # Convert to character and validate
-            try:
-                ch = chr(m_rec)
-                if not ch.isprintable():
-                    ch = '?'  # Replace non-printable characters
-            except ValueError:
-                ch = '?'
-                
-            message_chars.append(ch)
-            
-        return ''.join(message_chars)
+        # Convert to characters and replace non-printable ones
+        text = m_rec.astype(np.uint8).tobytes().decode('latin1')
+        return _NONPRINT_RE.sub('?', text)
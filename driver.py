@@ -1,7 +1,7 @@
 import numpy as np
-from arlc import ARLC, ARLCParams
+from arlc import ARLC, ARLCParams, Ciphertext
 import time
-from typing import Tuple, List
+from typing import Tuple
 
 def print_public_key(public_key: tuple):
     """Pretty print the public key (A, b) with their shapes and sample elements"""
@@ -25,16 +25,16 @@ def print_vector(name: str, vector: np.ndarray):
     print(f"First few elements: {vector[:10]}")
     print("-" * 50 + "\n")
 
-def print_ciphertext(ciphertext: List[Tuple[np.ndarray, int]]):
+def print_ciphertext(ciphertext: Ciphertext):
     """Pretty print ciphertext information for the first symbol"""
-    U, V = ciphertext[0]
+    U, V = ciphertext.U[0], ciphertext.V[0]
     print("Ciphertext for first symbol:")
     print("-" * 50)
     print("U (first 10 elements):", U[:10])
     print("V:", V)
     print("-" * 50 + "\n")
 
-def test_message(message: str, arlc: ARLC) -> Tuple[bool, float, float, float, str, List[Tuple[np.ndarray, int]]]:
+def test_message(message: str, arlc: ARLC) -> Tuple[bool, float, float, float, str, Ciphertext]:
     """Test encryption and decryption of a single message"""
     # Generate key pair
     start_time = time.time()